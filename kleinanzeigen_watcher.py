@@ -1,9 +1,9 @@
-import os, re, time, json
+import os, re, asyncio, functools, time
 from datetime import datetime, timezone
 from urllib.parse import quote_plus
-import requests
-from bs4 import BeautifulSoup
-import json as _json
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
+import orjson
 
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
@@ -15,7 +15,7 @@ if not SHEET_ID or not SERVICE_ACCOUNT_JSON:
     raise SystemExit("Env missing: SHEET_ID and GOOGLE_APPLICATION_CREDENTIALS_JSON are required.")
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-CREDS = Credentials.from_service_account_info(json.loads(SERVICE_ACCOUNT_JSON), scopes=SCOPES)
+CREDS = Credentials.from_service_account_info(orjson.loads(SERVICE_ACCOUNT_JSON), scopes=SCOPES)
 SHEETS = build("sheets", "v4", credentials=CREDS).spreadsheets()
 
 CONFIG_TAB = "Config"
@@ -28,46 +28,97 @@ BASE_HOST = "https://www.kleinanzeigen.de"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (+https://github.com/your-org/kleinanzeigen-watcher)",
     "Accept-Language": "de-DE,de;q=0.9",
+    "Accept-Encoding": "br, gzip",  # aiohttp decodes br when Brotli is installed
 }
+FETCH_CONCURRENCY = 8  # parallel search requests; keep low to stay under the anti-bot radar
+RETRY_STATUSES = (429, 502, 503, 504)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+RETRY_AFTER_MAX = 60  # seconds; cap on a server-sent Retry-After
+RATE_LIMIT_PER_SEC = 1.0  # sustained search-page requests/s to kleinanzeigen.de
+RATE_LIMIT_BURST = 3
+DETAIL_RATE_LIMIT_PER_SEC = 5.0  # detail-page price lookups get their own, looser bucket
+DETAIL_RATE_LIMIT_BURST = 10
 
 AD_CARD_SELECTOR = "article.aditem"
 TITLE_SELECTOR = ".aditem-main--middle--title a"
 PRICE_SELECTOR = ".aditem-main--middle--price-shipping .aditem-main--middle--price"
 META_SELECTOR = ".aditem-main--top .aditem-main--top--left"
 
+ACTIVE_VALUES = frozenset(("true", "1", "yes", "y", "ja"))
+
 KM_REGEX = re.compile(r"(\d{1,3}(?:[.\s]\d{3})+|\d{1,6})\s*km", re.IGNORECASE)
+PRICE_REGEX = re.compile(r"(\d{1,3}(?:[.\s]\d{3})*|\d+)(?:\.\d{1,2})?")
+AD_ID_REGEX = re.compile(r"/(\d{6,})-")
+CONSENT_REGEX = re.compile(rb"einwilligung.{0,200}cookies|cloudflare.{0,200}attention required", re.IGNORECASE | re.DOTALL)
+CONSENT_SCAN_BYTES = 65536
+NON_DIGIT_REGEX = re.compile(r"\D")
 
 # ---------- Google Sheets helpers ----------
 def read_sheet_range(tab, rng="A:Z"):
     res = SHEETS.values().get(spreadsheetId=SHEET_ID, range=f"{tab}!{rng}").execute()
     return res.get("values", [])
 
-def write_rows_append(tab, rows):
-    if not rows:
+def read_many(ranges):
+    # one batchGet round trip for several ranges; results come back in request order
+    res = SHEETS.values().batchGet(spreadsheetId=SHEET_ID, ranges=ranges).execute()
+    return res.get("valueRanges", [])
+
+def sheet_ids():
+    meta = SHEETS.get(spreadsheetId=SHEET_ID, includeGridData=False).execute()
+    return {s["properties"]["title"]: s["properties"]["sheetId"] for s in meta["sheets"]}
+
+def _cell_value(v):
+    # RAW-equivalent: numbers stay numbers, strings are stored as text, "" / None leave the cell empty
+    if v is None or v == "":
+        return {}
+    if isinstance(v, (int, float)):
+        return {"userEnteredValue": {"numberValue": v}}
+    return {"userEnteredValue": {"stringValue": str(v)}}
+
+def write_rows_append(groups):
+    # groups maps tab -> rows; one appendCells per tab, all in a single batchUpdate (one write per run)
+    groups = {tab: rows for tab, rows in groups.items() if rows}
+    if not groups:
         return
-    body = {"values": rows}
-    SHEETS.values().append(
-        spreadsheetId=SHEET_ID,
-        range=f"{tab}!A1",
-        valueInputOption="RAW",
-        insertDataOption="INSERT_ROWS",
-        body=body,
-    ).execute()
+    ids = sheet_ids()
+    requests = [
+        {
+          "appendCells": {
+            "sheetId": ids[tab],
+            "rows": [{"values": [_cell_value(v) for v in row]} for row in rows],
+            "fields": "userEnteredValue"
+          }
+        }
+        for tab, rows in groups.items()
+    ]
+    SHEETS.batchUpdate(spreadsheetId=SHEET_ID, body={"requests": requests}).execute()
 
 def ensure_headers(tab, headers):
     existing = read_sheet_range(tab, "A1:Z1")
     if existing and existing[0] == headers:
         return
-    SHEETS.values().clear(spreadsheetId=SHEET_ID, range=f"{tab}!A:Z").execute()
-    SHEETS.values().update(
-        spreadsheetId=SHEET_ID,
-        range=f"{tab}!A1",
-        valueInputOption="RAW",
-        body={"values": [headers]},
-    ).execute()
-
-def get_config():
-    cfg_rows = read_sheet_range(CONFIG_TAB, "A:B")
+    # need sheetId for updateCells
+    sheet_id = sheet_ids()[tab]
+    # clear A:Z and write the header in one write request
+    requests = [
+        {
+          "updateCells": {
+            "range": {"sheetId": sheet_id, "startColumnIndex": 0, "endColumnIndex": 26},
+            "fields": "userEnteredValue"
+          }
+        },
+        {
+          "updateCells": {
+            "start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": 0},
+            "rows": [{"values": [{"userEnteredValue": {"stringValue": h}} for h in headers]}],
+            "fields": "userEnteredValue"
+          }
+        },
+    ]
+    SHEETS.batchUpdate(spreadsheetId=SHEET_ID, body={"requests": requests}).execute()
+
+def get_config(cfg_rows):
     cfg = {}
     for r in cfg_rows:
         if not r or not r[0].strip():
@@ -79,8 +130,11 @@ def get_config():
     frequency = cfg.get("fetch_frequency", "daily")
     return max_radius, frequency
 
-def get_active_queries():
-    rows = read_sheet_range(SEARCHES_TAB)
+# sheet rows come back trimmed after the last non-empty cell; read missing cells as default
+def cell(row, col, default=""):
+    return row[col] if col < len(row) else default
+
+def get_active_queries(rows):
     if not rows or len(rows) < 2:
         return set()
     header = [h.lower() for h in rows[0]]
@@ -89,14 +143,13 @@ def get_active_queries():
         return set()
     active = set()
     for r in rows[1:]:
-        r += [""] * (len(header) - len(r))
-        if str(r[idx["active"]]).strip().lower() in ("true","1","yes","y","ja"):
-            q = str(r[idx["query"]]).strip()
+        if str(cell(r, idx["active"])).strip().lower() in ACTIVE_VALUES:
+            q = str(cell(r, idx["query"])).strip()
             if q:
                 active.add(q)
     return active
 
-def prune_results_rows_not_in_active_queries():
+def prune_results_rows_not_in_active_queries(searches):
     rows = read_sheet_range(RESULTS_TAB)
     if not rows or len(rows) < 2:
         return
@@ -105,7 +158,7 @@ def prune_results_rows_not_in_active_queries():
         q_col = header.index("query")
     except ValueError:
         return
-    active_q = get_active_queries()
+    active_q = get_active_queries(searches)
 
     # collect 0-based row indices (excluding header) to delete
     to_delete = []
@@ -147,15 +200,15 @@ def prune_results_rows_not_in_active_queries():
         print("Prune failed:", e)
 
 
-def _parse_price_from_detail_html(html: str):
+def _parse_price_from_detail_html(html: bytes):
     if not html:
         return None
     # 1) JSON-LD
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        for s in soup.select('script[type="application/ld+json"]'):
+        tree = LexborHTMLParser(html)
+        for s in tree.css('script[type="application/ld+json"]'):
             try:
-                data = _json.loads(s.string or "")
+                data = orjson.loads(s.text() or "")
             except Exception:
                 continue
             # normalize possible list
@@ -175,26 +228,24 @@ def _parse_price_from_detail_html(html: str):
 
     # 2) Microdata / visible price nodes
     try:
-        # re-use soup if present, else parse
-        soup = soup if 'soup' in locals() else BeautifulSoup(html, "html.parser")
+        # re-use tree if present, else parse
+        tree = tree if 'tree' in locals() else LexborHTMLParser(html)
         # itemprop price
-        el = soup.select_one('[itemprop="price"]')
+        el = tree.css_first('[itemprop="price"]')
         if el:
-            val = el.get("content") or el.get_text(" ", strip=True)
+            val = el.attributes.get("content") or el.text(separator=" ", strip=True)
             return parse_price_eur(val)
         # common classes
-        el = soup.select_one(".price, .boxedprice, .articleprice, .shopprice, h2.price, div.price")
+        el = tree.css_first(".price, .boxedprice, .articleprice, .shopprice, h2.price, div.price")
         if el:
-            return parse_price_eur(el.get_text(" ", strip=True))
+            return parse_price_eur(el.text(separator=" ", strip=True))
     except Exception:
         pass
     return None
 
-def _fetch_detail_price(url: str):
+async def _fetch_detail_price(session, url: str):
     try:
-        r = requests.get(url, headers=HEADERS, timeout=20)
-        r.raise_for_status()
-        return _parse_price_from_detail_html(r.text)
+        return _parse_price_from_detail_html(await get_html(session, url, timeout=20, limiter=DETAIL_RATE_LIMITER))
     except Exception:
         return None
 
@@ -211,11 +262,11 @@ def price_within(price, lo, hi):
 
 
 # ---------- Location IDs ----------
+@functools.lru_cache(maxsize=256)
 def normalize_city(s: str) -> str:
     return (s or "").strip().lower()
 
-def load_location_ids():
-    rows = read_sheet_range(LOCATIONS_TAB, "A:B")
+def load_location_ids(rows):
     loc_map = {}
     if not rows:
         return loc_map
@@ -224,12 +275,13 @@ def load_location_ids():
         if len(r) < 2:
             continue
         city = normalize_city(r[0])
-        loc_id = re.sub(r"\D", "", r[1]) if r[1] else ""
+        loc_id = NON_DIGIT_REGEX.sub("", r[1]) if r[1] else ""
         if city and loc_id:
             loc_map[city] = loc_id
     return loc_map
 
 # ---------- URL builder ----------
+@functools.lru_cache(maxsize=256)
 def build_search_url(query, location_str, radius_km, price_min, price_max, loc_id=None):
     q = quote_plus(query or "")
     slug = (location_str or "").strip().lower().replace(" ", "-") or "deutschland"
@@ -256,7 +308,7 @@ def parse_price_eur(text: str):
         t = t.replace(lab, " ")
     t = t.replace("€", " ").replace("eur", " ").replace(",", ".")
     # keep digits, dots and spaces; capture first number block
-    m = re.search(r"(\d{1,3}(?:[.\s]\d{3})*|\d+)(?:\.\d{1,2})?", t)
+    m = PRICE_REGEX.search(t)
     if not m:
         return None
     num = m.group(1).replace(".", "").replace(" ", "")
@@ -265,81 +317,159 @@ def parse_price_eur(text: str):
     except ValueError:
         return None
 
+def parse_int(val):
+    s = str(val).strip()
+    return int(s.replace("_", "")) if s else None
+
 def extract_km(text_blob):
     if not text_blob:
         return None
     m = KM_REGEX.search(text_blob.replace("\xa0", " "))
     return int(m.group(1).replace(".", "").replace(" ", "")) if m else None
 
-def ad_id_from_url(url):
-    m = re.search(r"/(\d{6,})-", url)
-    return m.group(1) if m else url
-
-def fetch_listings(search_url):
-    r = requests.get(search_url, headers=HEADERS, timeout=25)
-    r.raise_for_status()
-    html = r.text
-    soup = BeautifulSoup(html, "html.parser")
+# consent walls / bot challenges put their wording near the top; scan only that prefix, no lowercased copy
+def looks_like_consent(html: bytes):
+    return bool(CONSENT_REGEX.search(html, 0, CONSENT_SCAN_BYTES))
 
-    cards = soup.select("article.aditem, li.ad-listitem, div.aditem")
+def ad_id_from_url(url):
+    m = AD_ID_REGEX.search(url)
+    return int(m.group(1)) if m else url
+
+# async token bucket: refills `rate` tokens/s up to `burst`; callers wait only for their own token
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+RATE_LIMITER = TokenBucket(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST)
+DETAIL_RATE_LIMITER = TokenBucket(DETAIL_RATE_LIMIT_PER_SEC, DETAIL_RATE_LIMIT_BURST)
+
+# GET over the shared keep-alive session; retries transient statuses, connection errors and
+# timeouts with backoff. Returns the raw body bytes: lexbor parses UTF-8 bytes directly, so no str decode/copy.
+async def get_html(session, url, timeout, limiter):
+    for attempt in range(MAX_RETRIES + 1):
+        last_try = attempt == MAX_RETRIES
+        delay = RETRY_BACKOFF * 2 ** attempt
+        await limiter.acquire()
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+                if last_try or r.status not in RETRY_STATUSES:
+                    r.raise_for_status()
+                    return await r.read()
+                retry_after = r.headers.get("Retry-After", "").strip()
+                if r.status == 429 and retry_after.isdecimal():
+                    delay = max(delay, min(int(retry_after), RETRY_AFTER_MAX))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if last_try:
+                raise
+        # response is released (left the `async with`) before backing off
+        await asyncio.sleep(delay)
+
+# parsing half of a search: page bytes -> card dicts (no I/O; detail lookups happen in fetch_listings)
+def parse_cards_html(html: bytes):
+    tree = LexborHTMLParser(html)
+
+    cards = tree.css("article.aditem, li.ad-listitem, div.aditem")
+    if not cards and looks_like_consent(html):
+        raise RuntimeError("got a consent/anti-bot page instead of results")
     items = []
-    detail_lookups = 0
-    DETAIL_LOOKUP_LIMIT = 10  # be nice to the site
 
     for c in cards:
-        a = c.select_one(".aditem-main--middle--title a, a.ellipsis, a.ellipsis-text")
-        if not a or not a.get("href"):
+        a = c.css_first(".aditem-main--middle--title a, a.ellipsis, a.ellipsis-text")
+        if not a or not a.attributes.get("href"):
             continue
-        url = a["href"]
+        url = a.attributes["href"]
         if url.startswith("/"):
             url = BASE_HOST + url
-        title = a.get_text(strip=True)
+        title = a.text(strip=True)
+        # full card text, only needed for the km regex (mileage has no dedicated node)
+        card_text = c.text(separator=" ", strip=True)
 
-        # try to read any price-ish text from the card; if empty, fetch detail
+        # try to read any price-ish text from the card; if empty, the caller fetches the detail page
         price_text = ""
-        nodes = c.select(".aditem-main--middle--price, .aditem-price, .stat-price, .price")
+        nodes = c.css(".aditem-main--middle--price, .aditem-price, .stat-price, .price")
         if nodes:
-            price_text = " ".join(n.get_text(" ", strip=True) for n in nodes).strip()
+            price_text = " ".join(n.text(separator=" ", strip=True) for n in nodes).strip()
         if not price_text:
-            container = c.select_one(".aditem-main--middle--price-shipping") or c.select_one(".aditem-details")
+            container = c.css_first(".aditem-main--middle--price-shipping") or c.css_first(".aditem-details")
             if container:
-                price_text = container.get_text(" ", strip=True)
+                price_text = container.text(separator=" ", strip=True)
 
-        price_eur = parse_price_eur(price_text)
-
-        if price_eur is None and detail_lookups < DETAIL_LOOKUP_LIMIT:
-            detail_lookups += 1
-            dp = _fetch_detail_price(url)
-            if isinstance(dp, int):
-                price_eur = dp
-
-        meta_el = c.select_one(".aditem-main--top .aditem-main--top--left, .aditem-main--top")
-        meta_text = meta_el.get_text(" ", strip=True) if meta_el else ""
-        km = extract_km(c.get_text(" ", strip=True))
+        meta_el = c.css_first(".aditem-main--top .aditem-main--top--left, .aditem-main--top")
+        meta_text = meta_el.text(separator=" ", strip=True) if meta_el else ""
 
         items.append({
             "ad_id": ad_id_from_url(url),
             "title": title,
-            "price_eur": price_eur,
-            "km": km,
+            "price_eur": parse_price_eur(price_text),
+            "km": extract_km(card_text),
             "meta": meta_text,
             "url": url,
         })
 
     return items
 
-def load_existing_ad_ids():
-    rows = read_sheet_range(RESULTS_TAB, "A2:A")
-    return {r[0] for r in rows if r}
+async def fetch_listings(session, search_url):
+    html = await get_html(session, search_url, timeout=25, limiter=RATE_LIMITER)
+    items = parse_cards_html(html)
+
+    detail_lookups = 0
+    DETAIL_LOOKUP_LIMIT = 10  # be nice to the site
+    for it in items:
+        if it["price_eur"] is None and detail_lookups < DETAIL_LOOKUP_LIMIT:
+            detail_lookups += 1
+            dp = await _fetch_detail_price(session, it["url"])
+            if isinstance(dp, int):
+                it["price_eur"] = dp
+
+    return items
+
+# fetch all (search, url) jobs concurrently; failed fetches yield None
+async def fetch_all(jobs):
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def bounded_fetch(session, search, url):
+        async with sem:
+            try:
+                items = await fetch_listings(session, url)
+            except Exception as e:
+                print(f"Fetch failed for {search['query']} @ {search['location']}: {e}")
+                return None
+            return items
+
+    # one pooled connector: TCP+TLS to kleinanzeigen.de is set up once and kept alive
+    connector = aiohttp.TCPConnector(limit=FETCH_CONCURRENCY * 2, limit_per_host=FETCH_CONCURRENCY * 2, keepalive_timeout=30)
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        return await asyncio.gather(*(bounded_fetch(session, search, url) for search, url in jobs))
+
+# numeric ids are kept as ints (cheaper to hash and store); legacy non-numeric ids stay str
+def load_existing_ad_ids(rows):
+    return {int(r[0]) if r[0].isdecimal() else r[0] for r in rows if r}
 
 # ---------- Main ----------
 def main():
     ensure_headers(RESULTS_TAB, ["ad_id", "query", "title", "price_eur", "km", "location", "url", "posted_at", "fetched_at"])
 
-    max_radius, _ = get_config()
-    city_to_id = load_location_ids()
+    vrs = read_many([f"{CONFIG_TAB}!A:B", f"{SEARCHES_TAB}!A:Z", f"{LOCATIONS_TAB}!A:B", f"{RESULTS_TAB}!A2:A"])
+    cfg_rows, searches, loc_rows, existing_rows = (v.get("values", []) for v in vrs)
+
+    max_radius, _ = get_config(cfg_rows)
+    city_to_id = load_location_ids(loc_rows)
 
-    searches = read_sheet_range(SEARCHES_TAB)
     if not searches or len(searches) < 2:
         print("No searches found.")
         return
@@ -350,57 +480,80 @@ def main():
     for r in required:
         if r not in idx:
             raise RuntimeError(f"Missing column in Searches: {r}")
-    has_loc_id_col = "location_id" in idx
+    loc_id_col = idx.get("location_id")
+    active_col, query_col, location_col, type_col = idx["active"], idx["query"], idx["location"], idx["type"]
+    price_min_col, price_max_col, km_min_col, km_max_col = idx["price_min"], idx["price_max"], idx["km_min"], idx["km_max"]
 
-    existing_ids = load_existing_ad_ids()
+    existing_ids = load_existing_ad_ids(existing_rows)
     to_append = []
     now_iso = datetime.now(timezone.utc).isoformat()
 
-    for row in searches[1:]:
-        row += [""] * (len(header) - len(row))
-
-        active_val = str(row[idx["active"]]).strip().lower()
-        active = active_val in ("true", "1", "yes", "y", "ja")
-        if not active:
-            continue
+    # drop inactive rows in one pass before any per-field coercion
+    active_rows = [
+        row for row in searches[1:]
+        if str(cell(row, active_col)).strip().lower() in ACTIVE_VALUES
+    ]
 
-        query = str(row[idx["query"]]).strip()
-        location = str(row[idx["location"]]).strip()
-        price_min = int(str(row[idx["price_min"]]).replace("_","")) if str(row[idx["price_min"]]).strip() else None
-        price_max = int(str(row[idx["price_max"]]).replace("_","")) if str(row[idx["price_max"]]).strip() else None
-        kind = (str(row[idx["type"]]).strip().lower() or "generic")
+    jobs = []
+    for row in active_rows:
+        query = str(cell(row, query_col)).strip()
+        location = str(cell(row, location_col)).strip()
+        price_min = parse_int(cell(row, price_min_col))
+        price_max = parse_int(cell(row, price_max_col))
+        kind = (str(cell(row, type_col)).strip().lower() or "generic")
 
         km_min = km_max = None
         if kind == "vehicle":
-            km_min = int(str(row[idx["km_min"]]).replace("_","")) if str(row[idx["km_min"]]).strip() else None
-            km_max = int(str(row[idx["km_max"]]).replace("_","")) if str(row[idx["km_max"]]).strip() else None
+            km_min = parse_int(cell(row, km_min_col))
+            km_max = parse_int(cell(row, km_max_col))
 
         loc_id = None
-        if has_loc_id_col:
-            raw = str(row[idx["location_id"]]).strip()
-            loc_id = re.sub(r"\D", "", raw) if raw else None
+        if loc_id_col is not None:
+            raw = str(cell(row, loc_id_col)).strip()
+            loc_id = NON_DIGIT_REGEX.sub("", raw) if raw else None
         if not loc_id:
             loc_id = city_to_id.get(normalize_city(location))
 
         url = build_search_url(query, location, max_radius, price_min, price_max, loc_id=loc_id)
-
-        try:
-            items = fetch_listings(url)
-        except Exception as e:
-            print(f"Fetch failed for {query} @ {location}: {e}")
-            time.sleep(2)
+        jobs.append(({
+            "query": query,
+            "location": location,
+            "price_min": price_min,
+            "price_max": price_max,
+            "kind": kind,
+            "km_min": km_min,
+            "km_max": km_max,
+        }, url))
+
+    # searches that resolve to the same URL share one fetch + parse
+    first_search = {}
+    for search, url in jobs:
+        first_search.setdefault(url, search)
+    results = asyncio.run(fetch_all([(search, url) for url, search in first_search.items()]))
+    items_by_url = dict(zip(first_search, results))
+
+    for search, url in jobs:
+        items = items_by_url[url]
+        if items is None:
+            continue
+        # one set difference finds this page's unseen ads; pages with none skip the filter loop
+        new_ids = {it["ad_id"] for it in items} - existing_ids
+        if not new_ids:
             continue
+        query, kind = search["query"], search["kind"]
+        price_min, price_max = search["price_min"], search["price_max"]
+        km_min, km_max = search["km_min"], search["km_max"]
 
+        added = set()
         for it in items:
+            if it["ad_id"] not in new_ids or it["ad_id"] in added:
+                continue
             if kind == "vehicle":
                 if km_min is not None and (it["km"] is None or it["km"] < km_min):
                     continue
                 if km_max is not None and (it["km"] is None or it["km"] > km_max):
                     continue
 
-            if it["ad_id"] in existing_ids:
-                continue
-
             posted_at = ""
             loc_in_meta = ""
             if it["meta"]:
@@ -415,22 +568,22 @@ def main():
                 continue
 
             to_append.append([
-                it["ad_id"], query, it["title"],
+                str(it["ad_id"]), query, it["title"],
                 it["price_eur"] if it["price_eur"] is not None else "",
                 it["km"] if it["km"] is not None else "",
                 loc_in_meta, it["url"], posted_at, now_iso
             ])
-            existing_ids.add(it["ad_id"])
-
-        time.sleep(1.2)
+            added.add(it["ad_id"])
+        # only ads actually written are marked seen; filtered-out ones stay open for other searches
+        existing_ids |= added
 
     if to_append:
-        write_rows_append(RESULTS_TAB, to_append)
+        write_rows_append({RESULTS_TAB: to_append})
         print(f"Added {len(to_append)} new rows.")
     else:
         print("No new results.")
 
-    prune_results_rows_not_in_active_queries()
+    prune_results_rows_not_in_active_queries(searches)
 
 
 if __name__ == "__main__":